@@ -17,7 +17,8 @@
 # ##### END GPL LICENSE BLOCK #####
 
 
-if "bpy" in locals():
+# the submodules are only in the namespace when the package is being re-executed (Reload Scripts)
+if "core" in locals():
     import importlib
     importlib.reload(preferences)
     importlib.reload(core)
@@ -26,7 +27,7 @@ else:
     from . import core
 
 import bpy
-from bpy.types import Context, Menu
+from bpy.types import Context
 
 
 bl_info = {
@@ -41,30 +42,16 @@ bl_info = {
     "tracker_url": "https://github.com/kromar/blender_BackupManager/issues/new",
 }
 
-def prefs():
-    user_preferences = bpy.context.preferences
-    return user_preferences.addons[__package__].preferences
-
-class BM_MT_BR(Menu):
-    bl_label = 'Backup and Restore'
-    bl_idname = 'BM_MT_BR'
-
-    def draw(self, context):
-        pass
+prefs = core.prefs
 
 
 classes = (
     core.OT_BackupManager,
     preferences.BM_Preferences,
-    BM_MT_BR,
     )
 
+register_classes, unregister_classes = bpy.utils.register_classes_factory(classes)
 
-def menus_draw_fn(self, context: Context) -> None:
-    """Callback to add menus for exporters."""
-    layout = self.layout    
-    layout.menu(BM_MT_BR.bl_idname)   
-    
 
 def backupandrestore_menu_fn(self, context: Context) -> None:
     """Menu Callback for the export operator."""
@@ -74,14 +61,16 @@ def backupandrestore_menu_fn(self, context: Context) -> None:
 
 
 def register():    
-    [bpy.utils.register_class(c) for c in classes]
-    #bpy.types.TOPBAR_MT_file_defaults.append(menus_draw_fn)
+    register_classes()
+    # enabling without default_set registers before the addon entry exists
+    addon = bpy.context.preferences.addons.get(__package__)
+    if addon is not None:
+        core.set_debug(addon.preferences.debug)
     #bpy.types.TOPBAR_MT_file.append(backupandrestore_menu_fn)
 
 
 def unregister():
-    [bpy.utils.unregister_class(c) for c in classes]
-    #bpy.types.TOPBAR_MT_file_defaults.remove(menus_draw_fn)
+    unregister_classes()
     #bpy.types.TOPBAR_MT_file.remove(backupandrestore_menu_fn)
 
 if __name__ == "__main__":
@@ -19,36 +19,119 @@
 
 import bpy
 import os
+import re
 import shutil
-import numpy
+from concurrent.futures import ThreadPoolExecutor
 from bpy.types import Operator
 from bpy.props import StringProperty
 from . import preferences
 
 
 def prefs():
+    # looked up on every call, reverting or resetting the preferences replaces the addon entry without a re-register
     return bpy.context.preferences.addons[__package__].preferences
 
 
+_DEBUG = False
+
+
+def set_debug(state):
+    global _DEBUG
+    _DEBUG = bool(state)
+
+
+def _dbg(*args):
+    if _DEBUG:
+        print(*args)
+
+
 def find_versions(filepath):
     version_list = []
     
-    try:          
-        for file in os.listdir(os.path.dirname(filepath)):
-            path = os.path.join(filepath, file)
-            if os.path.isdir(path):      
-                version_list.append((file, file, ''))
+    try:
+        with os.scandir(filepath) as it:
+            version_list = [(entry.name, entry.name, '') for entry in it if entry.is_dir()]
 
-    except Exception:
+    except OSError:
         print("filepath invalid: ", filepath)
     
-    if prefs().debug:
-        print("\nVersion List: ", version_list)
+    _dbg("\nVersion List: ", version_list)
 
     return version_list
 
 
-    
+def is_float(value):
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+
+def perform_version_scan(search_mode, prefs_instance):
+    backup_version_list = preferences.BM_Preferences.backup_version_list
+    restore_version_list = preferences.BM_Preferences.restore_version_list
+    user_path = bpy.utils.resource_path(type='USER').strip(prefs_instance.active_blender_version)
+
+    if search_mode == 'SEARCH_BACKUP':
+        backup_version_list.clear() 
+        backup_version_list = find_versions(user_path)
+        backup_version_list.sort(reverse=True)
+
+        restore_version_list.clear()    
+        restore_version_list = list(dict.fromkeys(find_versions(prefs_instance.backup_path) + backup_version_list))
+        restore_version_list.sort(reverse=True)   
+
+    elif search_mode == 'SEARCH_RESTORE': 
+        restore_version_list.clear()        
+        restore_version_list = find_versions(prefs_instance.backup_path)
+        restore_version_list.sort(reverse=True) 
+
+        backup_version_list.clear() 
+        backup_version_list = list(dict.fromkeys(find_versions(user_path) + restore_version_list))
+        _dbg("list: ", backup_version_list)
+        
+        # remove custom items from list (assuming non floats are invalid)
+        backup_version_list = [version for version in backup_version_list if is_float(version[0])]
+        backup_version_list.sort(reverse=True)  
+
+    else:
+        return
+
+    # update version lists
+    preferences.BM_Preferences.restore_version_list = restore_version_list
+    preferences.BM_Preferences.backup_version_list = backup_version_list
+
+
+def copy_file(src, dst):
+    # a locked or vanished file should not abort the rest of the backup, report it back instead
+    try:
+        shutil.copyfile(src, dst)
+        return True
+    except OSError as e:
+        print("copy failed: ", src, e)
+        return False
+
+
+# separators allowed in the custom ignore field
+IGNORE_SPLIT = re.compile(r',|\s+')
+
+
+# backup toggle, restore toggle and the file or folder both leave out when switched off
+IGNORE_ITEMS = tuple(('backup_' + name, 'restore_' + name, pattern) for name, pattern in (
+    ('bookmarks', 'bookmarks.txt'),
+    ('recentfiles', 'recent-files.txt'),
+    ('startup_blend', 'startup.blend'),
+    ('userpref_blend', 'userpref.blend'),
+    ('workspaces_blend', 'workspaces.blend'),
+    ('cache', 'cache'),
+    ('datafile', 'datafiles'),
+    ('addons', 'addons'),
+    ('extensions', 'extensions'),
+    ('presets', 'presets'),
+))
+
+
 class OT_BackupManager(Operator):
     ''' run backup & restore '''
     bl_idname = "bm.run_backup_manager"
@@ -58,89 +141,63 @@ class OT_BackupManager(Operator):
     ignore_restore = []
 
 
-    def max_list_value(self, list):
-        i = numpy.argmax(list)
-        v = list[i]
+    def max_list_value(self, lst):
+        i = max(range(len(lst)), key=lst.__getitem__)
+        v = lst[i]
         return (i, v)
     
     
     def create_ignore_pattern(self):
         self.ignore_backup.clear()
         self.ignore_restore.clear()
+        pref = prefs()
 
-        
-        import re     
-        list = [x for x in re.split(',|\s+', prefs().ignore_files) if x!='']        
-        for item in list:
-            self.ignore_backup.append(item)
-            self.ignore_restore.append(item)
-
-        if not prefs().backup_bookmarks:
-            self.ignore_backup.append('bookmarks.txt')
-        if not prefs().restore_bookmarks:
-            self.ignore_restore.append('bookmarks.txt')
-        if not prefs().backup_recentfiles:
-            self.ignore_backup.append('recent-files.txt')
-        if not prefs().restore_recentfiles:
-            self.ignore_restore.append('recent-files.txt')   
-
-        if not prefs().backup_startup_blend:
-            self.ignore_backup.append('startup.blend')
-        if not prefs().restore_startup_blend:
-            self.ignore_restore.append('startup.blend')            
-        if not prefs().backup_userpref_blend:
-            self.ignore_backup.append('userpref.blend')
-        if not prefs().restore_userpref_blend:
-            self.ignore_restore.append('userpref.blend')            
-        if not prefs().backup_workspaces_blend:
-            self.ignore_backup.append('workspaces.blend')
-        if not prefs().restore_workspaces_blend:
-            self.ignore_restore.append('workspaces.blend')  
-
-        if not prefs().backup_cache:
-            self.ignore_backup.append('cache')
-        if not prefs().restore_cache:
-            self.ignore_restore.append('cache')
-
-        if not prefs().backup_datafile:
-            self.ignore_backup.append('datafiles')
-        if not prefs().restore_datafile:
-            self.ignore_restore.append('datafiles')
-
-        if not prefs().backup_addons:
-            self.ignore_backup.append('addons')
-        if not prefs().restore_addons:
-            self.ignore_restore.append('addons')
-            
-        if not prefs().backup_extensions:
-            self.ignore_backup.append('extensions')
-        if not prefs().restore_extensions:
-            self.ignore_restore.append('extensions')
-
-        if not prefs().backup_presets:
-            self.ignore_backup.append('presets')
-        if not prefs().restore_presets:
-            self.ignore_restore.append('presets')
+        custom = [x for x in IGNORE_SPLIT.split(pref.ignore_files) if x!='']
+        self.ignore_backup.extend(custom)
+        self.ignore_restore.extend(custom)
+
+        for backup_prop, restore_prop, pattern in IGNORE_ITEMS:
+            if not getattr(pref, backup_prop):
+                self.ignore_backup.append(pattern)
+            if not getattr(pref, restore_prop):
+                self.ignore_restore.append(pattern)
     
 
     def recursive_overwrite(self, src, dest, ignore=None):
-        if os.path.isdir(src):
-            if not os.path.isdir(dest):
-                os.makedirs(dest)
-            files = os.listdir(src)
-            ignored = ignore(src, files) if ignore is not None else set()
-            for f in files:
-                if f not in ignored:
-                    self.recursive_overwrite(os.path.join(src, f), 
-                                        os.path.join(dest, f), 
-                                        ignore)
-        else:
-            shutil.copyfile(src, dest)
+        # folders are created while walking, the file copies are mostly syscall latency and run on a thread pool
+        with ThreadPoolExecutor() as executor:
+            jobs = []
+            failed = self.queue_copies(executor, jobs, src, dest, ignore)
+            return failed + sum(not job.result() for job in jobs)
+
+
+    def queue_copies(self, executor, jobs, src, dest, ignore):
+        # an unreadable or vanished folder is skipped and counted like a failed copy
+        try:
+            os.makedirs(dest, exist_ok=True)
+            with os.scandir(src) as it:
+                entries = list(it)
+        except OSError as e:
+            print("copy failed: ", src, e)
+            return 1
+        failed = 0
+        ignored = ignore(src, [entry.name for entry in entries]) if ignore is not None else set()
+        for entry in entries:
+            if entry.name in ignored:
+                continue
+            target = os.path.join(dest, entry.name)
+            if entry.is_dir():
+                failed += self.queue_copies(executor, jobs, entry.path, target, ignore)
+            else:
+                jobs.append(executor.submit(copy_file, entry.path, target))
+        return failed
 
 
     def run_backup(self, source_path, target_path): 
+        pref = prefs()
+        failed = 0
 
-        if prefs().clean_path:
+        if pref.clean_path:
             if os.path.exists(target_path):
                 os.system(f'rmdir /S /Q "{target_path}"')
                 #shutil.rmtree(target_path, onerror = self.handler)
@@ -149,28 +206,27 @@ class OT_BackupManager(Operator):
                 print("\nFailed to clean path: ", target_path)
 
         # backup
-        self.create_ignore_pattern()
         #self.transfer_files(source_path, target_path)   
         print("source: ",  source_path)
         print("target: ", target_path)
 
         if os.path.isdir(source_path): 
-            if not prefs().dry_run:
-                self.recursive_overwrite(source_path, target_path,  ignore = shutil.ignore_patterns(*self.ignore_backup)) 
+            if not pref.dry_run:
+                failed = self.recursive_overwrite(source_path, target_path,  ignore = shutil.ignore_patterns(*self.ignore_backup)) 
+                preferences.clear_path_stats_cache()
 
             else:
                 print("dry run, no files modified")
 
+        print(40*"-")
+        return failed
 
-        """ 
-        if prefs().custom_version and prefs().custom_version_toggle:
-            self.ShowReport(path_index, "Backup complete from: " + self.generate_version(input='BACKUP') + " to: " +  prefs().custom_version, 'COLORSET_07_VEC') 
+
+    def report_result(self, failed):
+        if failed:
+            self.report({'WARNING'}, f"Backup incomplete, {failed} files failed to copy")
         else:
-            self.ShowReport(path_index, "Backup complete from: " + self.generate_version(input='BACKUP') + " to: " + self.generate_version(input='RESTORE'), 'COLORSET_07_VEC')
-        #"""
-        print(40*"-")
-        self.report({'INFO'}, "Backup Complete")
-        return {'FINISHED'}    
+            self.report({'INFO'}, "Backup Complete")
 
 
     def ShowReport(self, message = [], title = "Message Box", icon = 'INFO'):
@@ -181,117 +237,88 @@ class OT_BackupManager(Operator):
 
     
     def execute(self, context): 
-        
+        pref = prefs()
+        set_debug(pref.debug)
         backup_version_list = preferences.BM_Preferences.backup_version_list
         restore_version_list = preferences.BM_Preferences.restore_version_list  
 
-        if prefs().debug:
-            print("\n\nbutton_input: ", self.button_input)                    
+        _dbg("\n\nbutton_input: ", self.button_input)                    
         
-        if prefs().backup_path:     
+        if pref.backup_path:     
 
-            if prefs().use_system_id:
-                system_id_path = os.path.join(prefs().backup_path, prefs().system_id, prefs().backup_versions).replace("\\", "/")  
-            else:            
-                system_id_path = os.path.join(prefs().backup_path, prefs().backup_versions).replace("\\", "/") 
+            # these paths are only reported in debug mode, don't build them otherwise
+            if _DEBUG:
+                if pref.use_system_id:
+                    system_id_path = os.path.join(pref.backup_path, pref.system_id, pref.backup_versions).replace("\\", "/")  
+                else:            
+                    system_id_path = os.path.join(pref.backup_path, pref.backup_versions).replace("\\", "/") 
 
-            shared_path = os.path.join(prefs().backup_path, 'shared', prefs().backup_versions).replace("\\", "/") 
+                shared_path = os.path.join(pref.backup_path, 'shared', pref.backup_versions).replace("\\", "/") 
 
-            if prefs().debug: 
                 print("system_id_path: ", system_id_path)
                 print("shared_path: ", shared_path)
 
+            if self.button_input in {'BACKUP', 'BATCH_BACKUP', 'RESTORE', 'BATCH_RESTORE'}:
+                self.create_ignore_pattern()
 
             if self.button_input == 'BACKUP':         
-                if not prefs().advanced_mode:            
-                    source_path = os.path.join(prefs().blender_user_path).replace("\\", "/")
-                    target_path = os.path.join(prefs().backup_path, str(prefs().active_blender_version)).replace("\\", "/")                    
+                if not pref.advanced_mode:            
+                    source_path = os.path.join(pref.blender_user_path).replace("\\", "/")
+                    target_path = os.path.join(pref.backup_path, pref.active_blender_version).replace("\\", "/")                    
                 else:    
-                    source_path = os.path.join(prefs().blender_user_path.strip(prefs().active_blender_version),  prefs().backup_versions).replace("\\", "/")                                             
-                    if prefs().custom_version_toggle:
-                        target_path = os.path.join(prefs().backup_path, str(prefs().custom_version)).replace("\\", "/")
+                    source_path = os.path.join(pref.blender_user_path.strip(pref.active_blender_version),  pref.backup_versions).replace("\\", "/")                                             
+                    if pref.custom_version_toggle:
+                        target_path = os.path.join(pref.backup_path, pref.custom_version).replace("\\", "/")
                     else: 
-                        target_path = os.path.join(prefs().backup_path, prefs().restore_versions).replace("\\", "/")
-                self.run_backup(source_path, target_path)  
+                        target_path = os.path.join(pref.backup_path, pref.restore_versions).replace("\\", "/")
+                self.report_result(self.run_backup(source_path, target_path))
             
             elif self.button_input == 'BATCH_BACKUP':
+                user_root = pref.blender_user_path.strip(pref.active_blender_version)
+                failed = 0
                 for version in backup_version_list:
-                    if prefs().debug:
-                        print(version[0])
-                    source_path = os.path.join(prefs().blender_user_path.strip(prefs().active_blender_version),  version[0]).replace("\\", "/")
-                    target_path = os.path.join(prefs().backup_path, version[0]).replace("\\", "/")
-                    self.run_backup(source_path, target_path)   
+                    _dbg(version[0])
+                    source_path = os.path.join(user_root,  version[0]).replace("\\", "/")
+                    target_path = os.path.join(pref.backup_path, version[0]).replace("\\", "/")
+                    failed += self.run_backup(source_path, target_path)   
+                self.report_result(failed)
              
             elif self.button_input == 'DELETE_BACKUP':
-                if not prefs().advanced_mode:            
-                    target_path = os.path.join(prefs().backup_path, str(prefs().active_blender_version)).replace("\\", "/")                    
+                if not pref.advanced_mode:            
+                    target_path = os.path.join(pref.backup_path, pref.active_blender_version).replace("\\", "/")                    
                 else:                                                 
-                    if prefs().custom_version_toggle:
-                        target_path = os.path.join(prefs().backup_path, str(prefs().custom_version)).replace("\\", "/")
+                    if pref.custom_version_toggle:
+                        target_path = os.path.join(pref.backup_path, pref.custom_version).replace("\\", "/")
                     else:                
-                        target_path = os.path.join(prefs().backup_path, prefs().restore_versions).replace("\\", "/")
+                        target_path = os.path.join(pref.backup_path, pref.restore_versions).replace("\\", "/")
 
                 if os.path.exists(target_path): # TODO: does this need to go into clean mode?
                     os.system('rmdir /S /Q "{}"'.format(target_path))
+                    preferences.clear_path_stats_cache()
                     print("\nDeleted Backup: ", target_path)
 
             elif self.button_input == 'RESTORE':
-                if not prefs().advanced_mode:            
-                    source_path = os.path.join(prefs().backup_path, str(prefs().active_blender_version)).replace("\\", "/")
-                    target_path = os.path.join(prefs().blender_user_path).replace("\\", "/")
+                if not pref.advanced_mode:            
+                    source_path = os.path.join(pref.backup_path, pref.active_blender_version).replace("\\", "/")
+                    target_path = os.path.join(pref.blender_user_path).replace("\\", "/")
                 else:             
-                    source_path = os.path.join(prefs().backup_path, prefs().restore_versions).replace("\\", "/")
-                    target_path = os.path.join(prefs().blender_user_path.strip(prefs().active_blender_version),  prefs().backup_versions).replace("\\", "/")
-                self.run_backup(source_path, target_path) 
+                    source_path = os.path.join(pref.backup_path, pref.restore_versions).replace("\\", "/")
+                    target_path = os.path.join(pref.blender_user_path.strip(pref.active_blender_version),  pref.backup_versions).replace("\\", "/")
+                self.report_result(self.run_backup(source_path, target_path))
                 
             elif self.button_input == 'BATCH_RESTORE':
+                user_root = pref.blender_user_path.strip(pref.active_blender_version)
+                failed = 0
                 for version in restore_version_list:
-                    if prefs().debug:
-                        print(version[0])
-                    source_path = os.path.join(prefs().backup_path, version[0]).replace("\\", "/")
-                    target_path = os.path.join(prefs().blender_user_path.strip(prefs().active_blender_version),  version[0]).replace("\\", "/")                    
-                    self.run_backup(source_path, target_path) 
+                    _dbg(version[0])
+                    source_path = os.path.join(pref.backup_path, version[0]).replace("\\", "/")
+                    target_path = os.path.join(user_root,  version[0]).replace("\\", "/")                    
+                    failed += self.run_backup(source_path, target_path) 
+                self.report_result(failed)
            
 
-            elif self.button_input == 'SEARCH_BACKUP':
-                backup_version_list.clear() 
-                backup_version_list = find_versions(bpy.utils.resource_path(type='USER').strip(prefs().active_blender_version))
-                backup_version_list.sort(reverse=True)
-
-                restore_version_list.clear()    
-                restore_version_list = set(find_versions(prefs().backup_path) + backup_version_list)
-                restore_version_list = list(dict.fromkeys(restore_version_list))
-                restore_version_list.sort(reverse=True)   
-                
-                # update version lists
-                preferences.BM_Preferences.restore_version_list = restore_version_list
-                preferences.BM_Preferences.backup_version_list = backup_version_list
-            
-
-            elif self.button_input == 'SEARCH_RESTORE': 
-                restore_version_list.clear()        
-                restore_version_list = find_versions(prefs().backup_path)
-                restore_version_list.sort(reverse=True) 
-
-                backup_version_list.clear() 
-                backup_version_list = set(find_versions(bpy.utils.resource_path(type='USER').strip(prefs().active_blender_version)) + restore_version_list)
-                if prefs().debug:
-                    print("list 1: ", backup_version_list)
-                backup_version_list = list(dict.fromkeys(backup_version_list))
-                if prefs().debug:
-                    print("list 2: ", backup_version_list)
-                
-                # remove custom items from list (assuming non floats are invalid)
-                for version in backup_version_list: 
-                    try:
-                        float(version[0])
-                    except:
-                        backup_version_list.remove(version)
-                backup_version_list.sort(reverse=True)  
-                
-                # update version lists
-                preferences.BM_Preferences.restore_version_list = restore_version_list
-                preferences.BM_Preferences.backup_version_list = backup_version_list            
+            elif self.button_input in {'SEARCH_BACKUP', 'SEARCH_RESTORE'}:
+                perform_version_scan(self.button_input, pref)
 
         else:
             self.ShowReport(["Specify a Backup Path"] , "Backup Path missing", 'COLORSET_04_VEC')
@@ -18,12 +18,68 @@
 
 import bpy
 import os
+import time
 from datetime import datetime
 import socket
 from bpy.types import AddonPreferences
 from bpy.props import StringProperty, EnumProperty, BoolProperty
 
 
+SEARCH_MODE_FOR_TAB = {'BACKUP': 'SEARCH_BACKUP', 
+                       'RESTORE': 'SEARCH_RESTORE'}
+
+
+def _walk_stats(path):
+    # scandir hands back the entry type with the listing, so each file costs a single stat and no path joins
+    stack = [path]
+    while stack:
+        # unreadable or vanished folders are skipped
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    # follow file links like getmtime/getsize do, links to folders are skipped like in os.walk
+                    elif entry.is_file():
+                        # a file can vanish between the listing and its stat, skip only that file
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        yield stat
+        except OSError:
+            continue
+
+
+def _folder_stats(path):
+    latest_mtime = None
+    size = 0
+    for stat in _walk_stats(path):
+        size += stat.st_size
+        if latest_mtime is None or stat.st_mtime > latest_mtime:
+            latest_mtime = stat.st_mtime
+    return latest_mtime, size
+
+
+# the preferences panel redraws on every mouse move, keep folder stats around instead of walking the tree each time
+PATH_STATS_TTL = 30.0
+_path_stats_cache = {}
+
+
+def _cached_folder_stats(path):
+    now = time.monotonic()
+    entry = _path_stats_cache.get(path)
+    if entry is not None and now - entry[0] < PATH_STATS_TTL:
+        return entry[1]
+    stats = _folder_stats(path)
+    _path_stats_cache[path] = (now, stats)
+    return stats
+
+
+def clear_path_stats_cache():
+    _path_stats_cache.clear()
+
+
 class BM_Preferences(AddonPreferences):
     bl_idname = __package__  
     this_version = str(bpy.app.version[0]) + '.' + str(bpy.app.version[1])  
@@ -33,9 +89,14 @@ class BM_Preferences(AddonPreferences):
     restore_version_list = [(initial_version, initial_version, '', 0)]
     
     def update_version_list(self, context):
+        search_mode = SEARCH_MODE_FOR_TAB.get(self.tabs)
         if self.debug:
-            print("update_version_list: ", f'SEARCH_{self.tabs}')
-        bpy.ops.bm.run_backup_manager(button_input=f'SEARCH_{self.tabs}')        
+            print("update_version_list: ", search_mode)
+        if search_mode is None:
+            return
+        from . import core
+        core.set_debug(self.debug)
+        core.perform_version_scan(search_mode, self)
     
     # when user specified a custom temp path use that one as default, otherwise use the app default
     if bpy.context.preferences.filepaths.temporary_directory:        
@@ -53,6 +114,11 @@ class BM_Preferences(AddonPreferences):
         if self.debug:
             print("system id path: ", default_path)  
 
+    def update_debug(self, context):
+        from . import core
+        core.set_debug(self.debug)
+        self.update_system_id(context)
+
     print("Backup Manager Default path: ", default_path)
 
     backup_path: StringProperty(name="Backup Path", 
@@ -78,7 +144,7 @@ class BM_Preferences(AddonPreferences):
     system_id: StringProperty(name="ID", 
                               description="Current Computer Name", 
                               subtype='NONE',
-                              default=str(socket.getfqdn())) 
+                              default=socket.gethostname()) 
      
     use_system_id: BoolProperty(name="Shared configs", 
                                 description="use_system_id", 
@@ -87,7 +153,7 @@ class BM_Preferences(AddonPreferences):
     
     debug: BoolProperty(name="debug", 
                         description="debug", 
-                        update=update_system_id, 
+                        update=update_debug, 
                         default=False) # default = False  
     
     active_blender_version: StringProperty(name="Current Blender Version", 
@@ -106,7 +172,6 @@ class BM_Preferences(AddonPreferences):
     
     expand_version_selection: BoolProperty(name="Expand Versions", 
                                            description="Switch between dropdown and expanded version layout",
-                                           update=update_version_list, 
                                            default=True)  # default = True
     
     # BACKUP  
@@ -203,84 +268,60 @@ class BM_Preferences(AddonPreferences):
 
 
     def draw_backup_age(self, col, path):       
-        try:
-            files = [os.path.join(dp, f) for dp, dn, filenames in os.walk(path) for f in filenames]
-            latest_file = max(files, key=os.path.getmtime)            
-            current_time = datetime.now()
-            backup_date = datetime.fromtimestamp(os.path.getmtime(latest_file))       
-            backup_age = str(current_time - backup_date).split('.')[0]             
-            col.label(text= "Last change: " + backup_age)
-        except:
+        latest_mtime = _cached_folder_stats(path)[0]
+        if latest_mtime is None:
             col.label(text= "no data")
+            return
+        current_time = datetime.now()
+        backup_date = datetime.fromtimestamp(latest_mtime)       
+        backup_age = str(current_time - backup_date).split('.')[0]             
+        col.label(text= "Last change: " + backup_age)
 
 
     def draw_backup_size(self, col, path):
-        try:
-            #initialize the size
-            size = 0            
-            #use the walk() method to navigate through directory tree
-            for dirpath, dirnames, filenames in os.walk(path):
-                for i in filenames:                  
-                    #use join to concatenate all the components of path
-                    f = os.path.join(dirpath, i).replace("\\", "/")
-                    #use getsize to generate size in bytes and add it to the total size
-                    size += os.path.getsize(f)
-            #print(path, "\nsize: ", round(size*0.000001, 2))
-            col.label(text= "Size: " + str(round(size * 0.000001, 2)) +" MB  (" + "{:,}".format(size) + " bytes)")
-        except:
-            pass
+        size = _cached_folder_stats(path)[1]
+        #print(path, "\nsize: ", round(size*0.000001, 2))
+        col.label(text= "Size: " + str(round(size * 0.000001, 2)) +" MB  (" + "{:,}".format(size) + " bytes)")
+
+
+    def draw_path_info(self, col, text, icon, path):
+        col.label(text = text, icon = icon)
+        col.label(text = path)
+        self.draw_backup_age(col, path)
+        self.draw_backup_size(col, path)
 
 
     def draw_backup(self, box): 
+        # each property read is an RNA lookup, read the ones shared by labels and paths once per redraw
+        active_version = self.active_blender_version
+        advanced = self.advanced_mode
 
         row  = box.row()
         box1 = row.box() 
         col = box1.column()
-        if not self.advanced_mode:            
-            path = self.blender_user_path
-            col.label(text = "Backup From: " + str(self.active_blender_version), icon='COLORSET_03_VEC')   
-            col.label(text = path)      
-            self.draw_backup_age(col, path) 
-            self.draw_backup_size(col, path)            
+        if not advanced:            
+            self.draw_path_info(col, "Backup From: " + active_version, 'COLORSET_03_VEC', 
+                                self.blender_user_path)
                    
             box = row.box() 
             col = box.column()  
-            path =  os.path.join(self.backup_path, str(self.active_blender_version))
-            col.label(text = "Backup To: " + str(self.active_blender_version), icon='COLORSET_04_VEC')   
-            col.label(text = path)          
-            self.draw_backup_age(col, path)    
-            self.draw_backup_size(col, path)  
+            self.draw_path_info(col, "Backup To: " + active_version, 'COLORSET_04_VEC', 
+                                os.path.join(self.backup_path, active_version))
             
-        elif self.advanced_mode:   
-            if self.custom_version_toggle:    
-                path = os.path.join(self.blender_user_path.strip(self.active_blender_version),  self.backup_versions)
-                col.label(text = "Backup From: " + self.backup_versions, icon='COLORSET_03_VEC') 
-                col.label(text = path)       
-                self.draw_backup_age(col, path)
-                self.draw_backup_size(col, path)
-                                
-                box2 = row.box() 
-                col = box2.column()  
-                path = os.path.join(self.backup_path, str(self.custom_version))
-                col.label(text = "Backup To: " + str(self.custom_version), icon='COLORSET_04_VEC')   
-                col.label(text = path)     
-                self.draw_backup_age(col, path)    
-                self.draw_backup_size(col, path)                
+        else:   
+            # dynamic enum, reading it runs the item callback so only advanced mode pays for it
+            backup_versions = self.backup_versions
+            self.draw_path_info(col, "Backup From: " + backup_versions, 'COLORSET_03_VEC', 
+                                os.path.join(self.blender_user_path.strip(active_version),  backup_versions))
 
+            box2 = row.box() 
+            col = box2.column()  
+            if self.custom_version_toggle:    
+                self.draw_path_info(col, "Backup To: " + self.custom_version, 'COLORSET_04_VEC', 
+                                    os.path.join(self.backup_path, self.custom_version))
             else:                
-                path = os.path.join(self.blender_user_path.strip(self.active_blender_version),  self.backup_versions)
-                col.label(text = "Backup From: " + self.backup_versions, icon='COLORSET_03_VEC') 
-                col.label(text = path)       
-                self.draw_backup_age(col, path)
-                self.draw_backup_size(col, path)
-                
-                box2 = row.box() 
-                col = box2.column()  
-                path =  os.path.join(self.backup_path, self.restore_versions)
-                col.label(text = "Backup To: " + self.restore_versions, icon='COLORSET_04_VEC')   
-                col.label(text = path)
-                self.draw_backup_age(col, path)
-                self.draw_backup_size(col, path)
+                self.draw_path_info(col, "Backup To: " + self.restore_versions, 'COLORSET_04_VEC', 
+                                    os.path.join(self.backup_path, self.restore_versions))
 
             # Advanced options
             col = box1.column()   
@@ -300,13 +341,13 @@ class BM_Preferences(AddonPreferences):
         col = row.column()   
         col.scale_x = 0.8
         col.operator("bm.run_backup_manager", text="Backup Selected", icon='COLORSET_03_VEC').button_input = 'BACKUP' 
-        if self.advanced_mode:
+        if advanced:
             col.operator("bm.run_backup_manager", text="Backup All", icon='COLORSET_03_VEC').button_input = 'BATCH_BACKUP' 
         col.separator(factor=1.0)
         col.prop(self, 'dry_run')  
         col.prop(self, 'clean_path')  
         col.prop(self, 'advanced_mode') 
-        if self.advanced_mode:
+        if advanced:
             col.prop(self, 'custom_version_toggle')  
             col.prop(self, 'expand_version_selection')    
             col.separator(factor=1.0)
@@ -314,38 +355,30 @@ class BM_Preferences(AddonPreferences):
 
          
     def draw_restore(self, box):        
+        active_version = self.active_blender_version
+        advanced = self.advanced_mode
+
         row  = box.row() 
         box1 = row.box() 
         col = box1.column()
-        if not self.advanced_mode:            
-            path = os.path.join(self.backup_path, str(self.active_blender_version))
-            col.label(text = "Restore From: " + str(self.active_blender_version), icon='COLORSET_04_VEC')   
-            col.label(text = path)                  
-            self.draw_backup_age(col, path) 
-            self.draw_backup_size(col, path)            
+        if not advanced:            
+            self.draw_path_info(col, "Restore From: " + active_version, 'COLORSET_04_VEC', 
+                                os.path.join(self.backup_path, active_version))
                    
             box = row.box() 
             col = box.column()  
-            path =  self.blender_user_path
-            col.label(text = "Restore To: " + str(self.active_blender_version), icon='COLORSET_03_VEC')   
-            col.label(text = path)              
-            self.draw_backup_age(col, path)    
-            self.draw_backup_size(col, path)  
+            self.draw_path_info(col, "Restore To: " + active_version, 'COLORSET_03_VEC', 
+                                self.blender_user_path)
 
         else:        
-            path = os.path.join(self.backup_path, self.restore_versions)
-            col.label(text = "Restore From: " + self.restore_versions, icon='COLORSET_04_VEC')   
-            col.label(text = path)    
-            self.draw_backup_age(col, path)
-            self.draw_backup_size(col, path)
+            backup_versions = self.backup_versions
+            self.draw_path_info(col, "Restore From: " + self.restore_versions, 'COLORSET_04_VEC', 
+                                os.path.join(self.backup_path, self.restore_versions))
             
             box2 = row.box() 
             col = box2.column()  
-            path =  os.path.join(self.blender_user_path.strip(self.active_blender_version),  self.backup_versions)
-            col.label(text = "Restore To: " + self.backup_versions, icon='COLORSET_03_VEC')   
-            col.label(text = path)    
-            self.draw_backup_age(col, path)
-            self.draw_backup_size(col, path)
+            self.draw_path_info(col, "Restore To: " + backup_versions, 'COLORSET_03_VEC', 
+                                os.path.join(self.blender_user_path.strip(active_version),  backup_versions))
 
             # Advanced options
             col = box1.column() 
@@ -361,13 +394,13 @@ class BM_Preferences(AddonPreferences):
         col = row.column()
         col.scale_x = 0.8
         col.operator("bm.run_backup_manager", text="Restore Selected", icon='COLORSET_04_VEC').button_input = 'RESTORE'
-        if self.advanced_mode:
+        if advanced:
             col.operator("bm.run_backup_manager", text="Restore All", icon='COLORSET_04_VEC').button_input = 'BATCH_RESTORE'
         col.separator(factor=1.0)
         col.prop(self, 'dry_run')      
         col.prop(self, 'clean_path')   
         col.prop(self, 'advanced_mode')  
-        if self.advanced_mode:
+        if advanced:
             col.prop(self, 'expand_version_selection')  
  
     def draw_selection(self, box):     